@@ -5,9 +5,17 @@ January 2014
 Basic implementation of the IO monad - PURE until run with execute_IO!
 Allows for writing to stdout and reading from stdin.
 
+IO doubles as EitherT/MaybeT over IO: an IO.Fail short-circuits every
+bind after it, and is caught with catch_IO or turned back into an
+Either or Maybe by run_either_IO and run_maybe_IO.
+
+Files and sockets are opened with bracket or with_resource, which
+always release what they acquire, even when the program fails or raises.
+with_resource takes its handles from the ResourcePool execute_IO keeps,
+so repeated actions against the same file or socket share one handle.
+
 Does not allow:
     Reading or changing mutable variables
-    Opening files
     Running threads
     etc.
 
@@ -16,8 +24,13 @@ just add their types, constructors, and a bind case for them.
 """
 # pylint: disable=C0103
 
+import socket
+
 import monad
 import func
+import maybe
+import either
+from resource_pool import ResourcePool
 
 
 @monad.monadize
@@ -26,6 +39,11 @@ class IO(monad.Monad):
     FinalT = 0
     OutputT = 1
     InputT = 2
+    SuspendT = 3
+    FailT = 4
+    CatchT = 5
+    BracketT = 6
+    ResourceT = 7
 
     def __init__(self, IOtype, **IOkwargs):
         "Should not be called directly."
@@ -39,6 +57,29 @@ class IO(monad.Monad):
         elif IOtype == IO.InputT:
             self.IOtype = IOtype
             self.action = IOkwargs["action"]
+        elif IOtype == IO.SuspendT:
+            self.IOtype = IOtype
+            self.thunk = IOkwargs["thunk"]
+        elif IOtype == IO.FailT:
+            self.IOtype = IOtype
+            self.error = IOkwargs["error"]
+        elif IOtype == IO.CatchT:
+            self.IOtype = IOtype
+            self.action = IOkwargs["action"]
+            self.handler = IOkwargs["handler"]
+            self.followup = IOkwargs["followup"]
+        elif IOtype == IO.BracketT:
+            self.IOtype = IOtype
+            self.acquire = IOkwargs["acquire"]
+            self.release = IOkwargs["release"]
+            self.use = IOkwargs["use"]
+            self.followup = IOkwargs["followup"]
+        elif IOtype == IO.ResourceT:
+            self.IOtype = IOtype
+            self.key = IOkwargs["key"]
+            self.opener = IOkwargs["opener"]
+            self.use = IOkwargs["use"]
+            self.followup = IOkwargs["followup"]
 
     @classmethod
     def Final(cls, value):
@@ -55,6 +96,40 @@ class IO(monad.Monad):
         "Constructor for the IO Input type."
         return cls(IO.InputT, action=action)
 
+    @classmethod
+    def Suspend(cls, thunk):
+        """Constructor for the IO Suspend type, an IO action that is only
+        built (by calling thunk()) when execute_IO reaches it."""
+        return cls(IO.SuspendT, thunk=thunk)
+
+    @classmethod
+    def Fail(cls, error):
+        "Constructor for the IO Fail type, which every bind passes over."
+        return cls(IO.FailT, error=error)
+
+    @classmethod
+    def Catch(cls, action, handler, followup):
+        """Constructor for the IO Catch type. Runs action, or handler(error)
+        if action fails, and passes the result on to followup."""
+        return cls(IO.CatchT, action=action, handler=handler,
+                   followup=followup)
+
+    @classmethod
+    def Bracket(cls, acquire, release, use, followup):
+        """Constructor for the IO Bracket type. Runs acquire, then use and
+        release on the resource it gives, and passes the result of use on
+        to followup. release runs however use ends."""
+        return cls(IO.BracketT, acquire=acquire, release=release, use=use,
+                   followup=followup)
+
+    @classmethod
+    def Resource(cls, key, opener, use, followup):
+        """Constructor for the IO Resource type. Runs use on a handle for
+        key from the interpreter's ResourcePool, opened with opener() if
+        there is no idle one, and passes the result on to followup."""
+        return cls(IO.ResourceT, key=key, opener=opener, use=use,
+                   followup=followup)
+
     def bind(self, bindee):
         if self.IOtype == IO.FinalT:
             return bindee(self.value)
@@ -65,10 +140,44 @@ class IO(monad.Monad):
         elif self.IOtype == IO.InputT:
             return IO.Input(lambda s: self.action(s) >= bindee)
 
+        elif self.IOtype == IO.SuspendT:
+            return IO.Suspend(lambda: self.thunk() >= bindee)
+
+        elif self.IOtype == IO.FailT:
+            return self
+
+        elif self.IOtype == IO.CatchT:
+            return IO.Catch(self.action, self.handler,
+                            lambda x: self.followup(x) >= bindee)
+
+        elif self.IOtype == IO.BracketT:
+            return IO.Bracket(self.acquire, self.release, self.use,
+                              lambda x: self.followup(x) >= bindee)
+
+        elif self.IOtype == IO.ResourceT:
+            return IO.Resource(self.key, self.opener, self.use,
+                               lambda x: self.followup(x) >= bindee)
+
     @classmethod
     def return_m(cls, value):
         return cls.Final(value)
 
+    @classmethod
+    def tail_rec_m(cls, step, seed):
+        # Pure steps are looped over here; effectful ones suspend the rest
+        # of the loop so that execute_IO unrolls it one step at a time.
+        while True:
+            action = step(seed)
+            if action.IOtype != IO.FinalT:
+                return action >= (lambda result:
+                       IO.Suspend(lambda: IO.tail_rec_m(step, result.value))
+                       if result.EitherT == result.LeftT
+                       else IO.Final(result.value))
+            if action.value.EitherT == action.value.LeftT:
+                seed = action.value.value
+            else:
+                return IO.Final(action.value.value)
+
     def __str__(self):
         if self.IOtype == IO.FinalT:
             return "IO.Final({})".format(self.value)
@@ -77,6 +186,19 @@ class IO(monad.Monad):
                                               self.followup)
         elif self.IOtype == IO.InputT:
             return "IO.Input({})".format(self.action.__name__)
+        elif self.IOtype == IO.SuspendT:
+            return "IO.Suspend({})".format(self.thunk.__name__)
+        elif self.IOtype == IO.FailT:
+            return "IO.Fail({})".format(self.error)
+        elif self.IOtype == IO.CatchT:
+            return "IO.Catch({}, {})".format(self.action,
+                                             self.handler.__name__)
+        elif self.IOtype == IO.BracketT:
+            return "IO.Bracket({}, {}, {})".format(self.acquire,
+                                                   self.release.__name__,
+                                                   self.use.__name__)
+        elif self.IOtype == IO.ResourceT:
+            return "IO.Resource({}, {})".format(self.key, self.use.__name__)
 
     def __repr__(self):
         return self.__str__()
@@ -92,26 +214,365 @@ def put_line(string):
     return IO.Output(string, IO.Final(func.Unit()))
 
 
-def execute_IO(IO_action, return_unit=False):
+def fail_IO(error):
+    "IO construct that fails with error, skipping the rest of the program."
+    return IO.Fail(error)
+
+
+def catch_IO(IO_action, handler):
+    "Runs IO_action, falling back to handler(error) if it fails."
+    return IO.Catch(IO_action, handler, IO.Final)
+
+
+def lift_either(either_value):
+    "Lifts an Either into IO: Right(x) -> IO.Final(x), Left(e) -> IO.Fail(e)"
+    if either_value.EitherT == either.Either.RightT:
+        return IO.Final(either_value.value)
+    return IO.Fail(either_value.value)
+
+
+def lift_maybe(maybe_value):
+    "Lifts a Maybe into IO: Just(x) -> IO.Final(x), Nothing -> IO.Fail(Unit())"
+    if maybe_value.is_just:
+        return IO.Final(maybe_value.value)
+    return IO.Fail(func.Unit())
+
+
+def perform(effect):
+    """IO construct that calls effect() when it is run and returns its
+    result. Used to build the actions that work on handles."""
+    return IO.Suspend(lambda: IO.Final(effect()))
+
+
+def bracket(acquire, release, use):
+    """
+    IO construct that runs acquire, then use(resource), then
+    release(resource), returning the result of use. release runs even if
+    use fails or raises, like bracket from Control.Exception.
+    """
+    return IO.Bracket(acquire, release, use, IO.Final)
+
+
+def with_resource(key, opener, use):
+    """IO construct that runs use on a pooled handle for key, opening it
+    with opener() the first time. The handle goes back to the pool when
+    use is done, or is closed if use raised."""
+    return IO.Resource(key, opener, use, IO.Final)
+
+
+def with_file(path, mode, use):
+    """
+    Runs use on the file at path opened with mode. Only modes where reusing
+    a handle is the same as opening a new one are pooled: appending, and
+    reading only (the file is rewound before each use). Any other mode,
+    such as "w" which truncates on open, gets a new handle every time,
+    closed by bracket.
+    """
+    opener = lambda: open(path, mode)
+    plain_mode = mode.replace("b", "")
+    if plain_mode == "r":
+        return with_resource(("file", path, mode), opener,
+                             lambda handle: perform(lambda: handle.seek(0)) >>
+                             use(handle))
+    elif plain_mode == "a":
+        return with_resource(("file", path, mode), opener, use)
+    return bracket(perform(opener),
+                   lambda handle: perform(lambda: handle.close() or
+                                          func.Unit()),
+                   use)
+
+
+def with_socket(address, use):
+    """with_resource for stream sockets connected to address, a (host,
+    port) pair or the path of a Unix socket."""
+    def connect():
+        "Opens the connection."
+        if isinstance(address, basestring):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(address)
+            return connection
+        return socket.create_connection(address)
+    return with_resource(("socket", address), connect, use)
+
+
+def read_handle(handle, size=-1):
+    "IO construct reading (up to size bytes) from a file handle."
+    return perform(lambda: handle.read(size))
+
+
+def write_handle(handle, data):
+    "IO construct writing data to a file handle and flushing it."
+    def write():
+        "Writes and flushes."
+        handle.write(data)
+        handle.flush()
+        return func.Unit()
+    return perform(write)
+
+
+def send_all(connection, data):
+    "IO construct sending all of data down a socket."
+    return perform(lambda: connection.sendall(data) or func.Unit())
+
+
+def receive(connection, size):
+    "IO construct receiving up to size bytes from a socket."
+    return perform(lambda: connection.recv(size))
+
+
+def run_IO(IO_action, pool=None):
+    """
+    The IO interpreter. Runs IO_action until it reaches an IO.Final or an
+    IO.Fail, and returns that node.
+
+    Handles for with_resource come from pool. Without one, a pool is made
+    for this run and its handles closed at the end.
+    """
+    if pool is not None:
+        return _interpret(IO_action, pool)
+    pool = ResourcePool()
+    try:
+        return _interpret(IO_action, pool)
+    finally:
+        pool.close_all()
+
+
+# Frames on the interpreter's stack, for the nodes that wait on the
+# outcome of an inner action.
+_CatchFrame = 0      # (kind, handler, followup)
+_ThenFrame = 1       # (kind, followup)
+_AcquireFrame = 2    # (kind, bracket node)
+_ReleaseFrame = 3    # (kind, bracket node, resource)
+_ReleasedFrame = 4   # (kind, bracket node, outcome of use)
+_ResourceFrame = 5   # (kind, key, handle, followup)
+
+
+def _interpret(IO_action, pool):
+    """
+    The loop behind run_IO. Catch, Bracket and Resource push a frame and
+    go on with their inner action; when that reaches a Final or a Fail
+    the top frame decides what runs next. A Fail unwinds to the nearest
+    Catch. If an exception escapes, pending releases are run and pooled
+    handles discarded before it is re-raised.
+    """
+    frames = []
+    try:
+        while True:
+            if IO_action.IOtype == IO.FinalT or IO_action.IOtype == IO.FailT:
+                if not frames:
+                    return IO_action
+                IO_action = _pop_frame(frames, IO_action, pool)
+
+            elif IO_action.IOtype == IO.OutputT:
+                print IO_action.output
+                IO_action = IO_action.followup
+
+            elif IO_action.IOtype == IO.InputT:
+                IO_action = IO_action.action(raw_input(""))
+
+            elif IO_action.IOtype == IO.SuspendT:
+                IO_action = IO_action.thunk()
+
+            elif IO_action.IOtype == IO.CatchT:
+                frames.append((_CatchFrame, IO_action.handler,
+                               IO_action.followup))
+                IO_action = IO_action.action
+
+            elif IO_action.IOtype == IO.BracketT:
+                frames.append((_AcquireFrame, IO_action))
+                IO_action = IO_action.acquire
+
+            elif IO_action.IOtype == IO.ResourceT:
+                handle = pool.acquire(IO_action.key, IO_action.opener)
+                frames.append((_ResourceFrame, IO_action.key, handle,
+                               IO_action.followup))
+                IO_action = IO_action.use(handle)
+
+            else:
+                raise ValueError("Malformed IO action.")
+    except BaseException:
+        _unwind(frames, pool)
+        raise
+
+
+def _pop_frame(frames, outcome, pool):
+    "Pops the top frame given the Final or Fail outcome, and says what's next."
+    frame = frames.pop()
+    failed = outcome.IOtype == IO.FailT
+
+    if frame[0] == _CatchFrame:
+        _, handler, followup = frame
+        if not failed:
+            return followup(outcome.value)
+        # catch_IO's followup is IO.Final, which needs no frame; this keeps
+        # retry loops built from catch_IO from growing the stack.
+        if followup != IO.Final:
+            frames.append((_ThenFrame, followup))
+        return handler(outcome.error)
+
+    elif frame[0] == _ThenFrame:
+        return outcome if failed else frame[1](outcome.value)
+
+    elif frame[0] == _AcquireFrame:
+        if failed:
+            return outcome
+        frames.append((_ReleaseFrame, frame[1], outcome.value))
+        return frame[1].use(outcome.value)
+
+    elif frame[0] == _ReleaseFrame:
+        _, bracket_node, resource = frame
+        frames.append((_ReleasedFrame, bracket_node, outcome))
+        return bracket_node.release(resource)
+
+    elif frame[0] == _ReleasedFrame:
+        _, bracket_node, used = frame
+        if used.IOtype == IO.FailT:
+            return used
+        if failed:
+            return outcome
+        return bracket_node.followup(used.value)
+
+    elif frame[0] == _ResourceFrame:
+        _, key, handle, followup = frame
+        pool.release(key, handle)
+        return outcome if failed else followup(outcome.value)
+
+
+def _unwind(frames, pool):
+    "Runs pending releases and discards pooled handles after an exception."
+    while frames:
+        frame = frames.pop()
+        if frame[0] == _ReleaseFrame:
+            _interpret(frame[1].release(frame[2]), pool)
+        elif frame[0] == _ResourceFrame:
+            pool.discard(frame[2])
+
+
+def _coalesce(outputs):
+    """Splits a list of outputs into runs that can be printed as one
+    string. Only outputs of the same string type are joined, so printing
+    the joined run writes exactly what printing each output would."""
+    runs = []
+    for output in outputs:
+        if (runs and type(output) in (str, unicode) and
+                type(output) is type(runs[-1][-1])):
+            runs[-1].append(output)
+        else:
+            runs.append([output])
+    return [run[0] if len(run) == 1 else "\n".join(run) for run in runs]
+
+
+def optimize_IO(IO_action):
+    """
+    Rewrites IO_action into an equivalent, cheaper program:
+        Runs of adjacent Outputs become a single Output.
+        Catches of an action that is already Final or Fail are resolved.
+        Programs produced by Input, and by the followups of Catch,
+        Bracket and Resource, are optimized as they are produced.
+
+    Suspend is left alone: it is what tail_rec_m loops are made of, and
+    optimizing every step of a loop costs more than it saves.
+
+    The result is cached on IO_action, so optimizing a static program
+    (such as a module-level constant) a second time is free. Binding onto
+    the result builds new, unoptimized nodes as usual, so optimize the
+    finished program rather than its parts.
+    """
+    cached = getattr(IO_action, "_optimized", None)
+    if cached is not None:
+        return cached
+
+    outputs = []
+    node = IO_action
+    rewritten = False
+    while True:
+        if node.IOtype == IO.OutputT:
+            outputs.append(node.output)
+            node = node.followup
+            continue
+
+        rewritten = rewritten or node.IOtype in (IO.CatchT, IO.BracketT,
+                                                 IO.ResourceT, IO.InputT)
+        if node.IOtype == IO.CatchT:
+            action = optimize_IO(node.action)
+            if action.IOtype == IO.FinalT:
+                node = node.followup(action.value)
+            elif action.IOtype == IO.FailT:
+                node = node.handler(action.error) >= node.followup
+            else:
+                node = IO.Catch(action, node.handler,
+                                lambda x, followup=node.followup:
+                                optimize_IO(followup(x)))
+                break
+
+        elif node.IOtype == IO.BracketT:
+            node = IO.Bracket(node.acquire, node.release, node.use,
+                              lambda x, followup=node.followup:
+                              optimize_IO(followup(x)))
+            break
+
+        elif node.IOtype == IO.ResourceT:
+            node = IO.Resource(node.key, node.opener, node.use,
+                               lambda x, followup=node.followup:
+                               optimize_IO(followup(x)))
+            break
+
+        elif node.IOtype == IO.InputT:
+            node = IO.Input(lambda s, action=node.action:
+                            optimize_IO(action(s)))
+            break
+
+        else:
+            break
+
+    coalesced = _coalesce(outputs)
+    if not rewritten and len(coalesced) == len(outputs):
+        # Nothing to improve: skip rebuilding the same program.
+        IO_action._optimized = IO_action
+        return IO_action
+
+    for output in reversed(coalesced):
+        node = IO.Output(output, node)
+
+    node._optimized = node
+    IO_action._optimized = node
+    return node
+
+
+def execute_IO(IO_action, return_unit=False, pool=None):
     """
     Takes an IO instance and actually runs it.
     Sort of analogous to unsafePerformIO, except you actually do
     have to use it because python won't do it for you.
+
+    Raises a ValueError if the action fails and nothing catches it.
+    Pass a ResourcePool to share handles between runs, or to look at its
+    stats afterwards; otherwise one is made and closed for this run.
     """
-    if IO_action.IOtype == IO.FinalT:
-        if return_unit:
-            return IO_action.value
+    outcome = run_IO(IO_action, pool)
+    if outcome.IOtype == IO.FailT:
+        raise ValueError("Uncaught IO failure: {}".format(outcome.error))
+
+    if return_unit:
+        return outcome.value
+    else:
+        if outcome.value == func.Unit():
+            return None
         else:
-            if IO_action.value == func.Unit():
-                return None
-            else:
-                return IO_action.value
+            return outcome.value
+
 
-    elif IO_action.IOtype == IO.OutputT:
-        print IO_action.output
-        return execute_IO(IO_action.followup)
+def run_either_IO(IO_action, pool=None):
+    "Runs IO_action, returning Left(error) if it fails, else Right(value)."
+    outcome = run_IO(IO_action, pool)
+    if outcome.IOtype == IO.FailT:
+        return either.Either.Left(outcome.error)
+    return either.Either.Right(outcome.value)
 
-    elif IO_action.IOtype == IO.InputT:
-        return execute_IO(IO_action.action(raw_input("")))
 
-    raise ValueError("Malformed IO action.")
+def run_maybe_IO(IO_action, pool=None):
+    "Runs IO_action, returning Nothing if it fails, else Just(value)."
+    outcome = run_IO(IO_action, pool)
+    if outcome.IOtype == IO.FailT:
+        return maybe.Maybe.Nothing()
+    return maybe.Maybe.Just(outcome.value)
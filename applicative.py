@@ -0,0 +1,109 @@
+"""
+Applicative functions from Control.Applicative, for Maybe, Either,
+Validation and IO.
+
+Unlike the Control.Monad helpers, nothing here threads one value into
+the next through bind: the arguments are independent, so they are
+checked in a single loop and the function is applied once at the end.
+For Validation every Failure is inspected and their errors collected.
+IO, and any other Monad, goes through monad.sequence, which runs the
+actions in order in a single tail_rec_m loop.
+"""
+# pylint: disable=C0103, W0142
+
+import monad
+import maybe
+import either
+import validation
+
+
+def pure(applicative_t, value):
+    "Equivalent to Haskell's pure."
+    if issubclass(applicative_t, validation.Validation):
+        return applicative_t.pure(value)
+    return applicative_t.return_m(value)
+
+
+def _sequence_maybe(values):
+    "sequence_a for Maybe: the first Nothing, else Just all the values."
+    results = []
+    for value in values:
+        if value.is_nothing:
+            return maybe.Maybe.Nothing()
+        results.append(value.value)
+    return maybe.Maybe.Just(results)
+
+
+def _sequence_either(values):
+    "sequence_a for Either: the first Left, else Right all the values."
+    results = []
+    for value in values:
+        if value.EitherT == either.Either.LeftT:
+            return value
+        results.append(value.value)
+    return either.Either.Right(results)
+
+
+def _sequence_validation(values):
+    "sequence_a for Validation: every error, else Success all the values."
+    results = []
+    errors = []
+    for value in values:
+        if value.is_failure:
+            errors.extend(value.value)
+        elif not errors:
+            results.append(value.value)
+    if errors:
+        return validation.Validation.Failure(*errors)
+    return validation.Validation.Success(results)
+
+
+_SEQUENCERS = {
+    maybe.Maybe: _sequence_maybe,
+    either.Either: _sequence_either,
+    validation.Validation: _sequence_validation,
+}
+
+
+def sequence_a(applicative_t, values):
+    """Combines independent applicative values into one holding the list
+    of their results."""
+    for klass in applicative_t.__mro__:
+        if klass in _SEQUENCERS:
+            return _SEQUENCERS[klass](values)
+    return monad.sequence(applicative_t, list(values))
+
+
+def fmap(applicative_t, function, value):
+    "Applies function inside value, like Haskell's fmap or <$>."
+    if isinstance(value, maybe.Maybe):
+        return maybe.Maybe.Just(function(value.value)) if value.is_just \
+            else value
+    elif isinstance(value, either.Either):
+        return either.Either.Right(function(value.value)) \
+            if value.EitherT == either.Either.RightT else value
+    elif isinstance(value, validation.Validation):
+        return validation.Validation.Success(function(value.value)) \
+            if value.is_success else value
+    return value >= (lambda x: applicative_t.return_m(function(x)))
+
+
+def lift_a_n(applicative_t, function, *values):
+    """
+    Applies function to the results of all the values, like liftA2,
+    liftA3 and so on rolled into one.
+    """
+    return fmap(applicative_t, lambda results: function(*results),
+                sequence_a(applicative_t, values))
+
+
+def ap(applicative_t, function_value, value):
+    "Sequential application, Haskell's <*>."
+    return lift_a_n(applicative_t, lambda f, x: f(x), function_value, value)
+
+
+def traverse_a(applicative_t, transform, from_list):
+    """Maps transform over from_list and combines the results. Maybe and
+    Either stop calling transform at the first failure, Validation calls
+    it on every element to gather all the errors."""
+    return sequence_a(applicative_t, (transform(a) for a in from_list))
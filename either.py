@@ -53,6 +53,18 @@ class Either(monad.Monad):
     def return_m(cls, value):
         return cls.Right(value)
 
+    @classmethod
+    def tail_rec_m(cls, step, seed):
+        while True:
+            result = step(seed)
+            if result.EitherT == Either.LeftT:
+                return result
+            result = result.value
+            if result.EitherT == Either.LeftT:
+                seed = result.value
+            else:
+                return cls.Right(result.value)
+
     def __str__(self):
         return "{}({})".format("Right" if self.EitherT == Either.RightT
                                else "Left", self.value)
@@ -60,6 +72,10 @@ class Either(monad.Monad):
     def __repr__(self):
         return str(self)
 
+    def __reduce__(self):
+        "Pickles as a constructor call instead of a __dict__."
+        return (type(self), (self.EitherT, self.value))
+
 
 def either(left_callback, right_callback, either_value):
     """
@@ -37,9 +37,22 @@ class Maybe(Monad, MonadPlus):
         elif self.kind == Maybe.NothingType:
             return Maybe.Nothing()
 
-    def return_m(self, val):
+    @classmethod
+    def return_m(cls, val):
         return Maybe.Just(val)
 
+    @classmethod
+    def tail_rec_m(cls, step, seed):
+        while True:
+            result = step(seed)
+            if result.is_nothing:
+                return Maybe.Nothing()
+            result = result.value
+            if result.EitherT == result.LeftT:
+                seed = result.value
+            else:
+                return Maybe.Just(result.value)
+
     # Maybe as a MonadPlus
     @property
     def mzero(self):
@@ -83,6 +96,12 @@ class Maybe(Monad, MonadPlus):
     def __repr__(self):
         return str(self)
 
+    def __reduce__(self):
+        "Pickles as a constructor call instead of a __dict__."
+        if self.is_nothing:
+            return (type(self), (Maybe.NothingType,))
+        return (type(self), (Maybe.JustType, self.value))
+
 
 def maybe(default, func, maybe_val):
     """Takes a default value, a function, and a Maybe value.
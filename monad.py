@@ -59,6 +59,22 @@ class Monad(object):
         raise NotImplementedError(
             "Your monad must implement return_m.")
 
+    @classmethod
+    def tail_rec_m(cls, step, seed):
+        """
+        Runs a monadic loop, like tailRecM from PureScript:
+            tail_rec_m :: (a -> Monad(Either(a, b))) -> a -> Monad(b)
+
+        step(seed) gives back Left(next_seed) to go around again, or
+        Right(result) to stop. This default just binds, so it is no more
+        stack safe than bind; override it with a loop where possible.
+        sequence and sequence_ only use tail_rec_m for monads that do.
+        """
+        return step(seed) >= (lambda result:
+               cls.tail_rec_m(step, result.value)
+               if result.EitherT == result.LeftT
+               else cls.return_m(result.value))
+
 
 class MonadPlus(object):  # Monad
 
@@ -77,22 +93,65 @@ class MonadPlus(object):  # Monad
         raise NotImplementedError
 
 
+def _from_cons(cons_list):
+    "Turns the reversed (head, tail) pairs built by the loops into a list."
+    result = []
+    while cons_list is not None:
+        head, cons_list = cons_list
+        result.append(head)
+    result.reverse()
+    return result
+
+
+def _provides_tail_rec_m(monad_t):
+    "True if monad_t overrides the bind-based default tail_rec_m."
+    return monad_t.tail_rec_m.__func__ is not Monad.tail_rec_m.__func__
+
+
 def sequence(monad_t, monad_list):
     """Evaluates each action in sequence from left to right and
     collects the results."""
-    def helper(monad, acc):
-        "Helper for sequence."
-        return monad >= (lambda x:
-              (acc >= (lambda xs:
-              (monad_t.return_m(xs + [x])))))
-
-    return func.foldr(helper, monad_t.return_m([]), list(reversed(monad_list)))
+    monad_list = list(monad_list)
+    if not _provides_tail_rec_m(monad_t):
+        # A fold keeps the stack flat for strict monads, unlike the
+        # default tail_rec_m.
+        def helper(monad, acc):
+            "Helper for sequence."
+            return monad >= (lambda x:
+                  (acc >= (lambda xs:
+                  (monad_t.return_m(xs + [x])))))
+
+        return func.foldr(helper, monad_t.return_m([]),
+                          list(reversed(monad_list)))
+
+    def step(state):
+        "Runs the next action and conses its result."
+        index, results = state
+        if index == len(monad_list):
+            return monad_t.return_m(either.Either.Right(_from_cons(results)))
+        return monad_list[index] >= (lambda x:
+               monad_t.return_m(either.Either.Left((index + 1,
+                                                    (x, results)))))
+
+    return monad_t.tail_rec_m(step, (0, None))
 
 
 def sequence_(monad_t, monad_list):
     """Evaluates each action in sequence from
     left to right and dumps the results."""
-    return func.foldr(monad_t.then, monad_t.return_m(func.Unit()), monad_list)
+    monad_list = list(monad_list)
+    if not _provides_tail_rec_m(monad_t):
+        return func.foldr(monad_t.then, monad_t.return_m(func.Unit()),
+                          monad_list)
+
+    def step(index):
+        "Runs the next action."
+        if index == len(monad_list):
+            return monad_t.return_m(either.Either.Right(func.Unit()))
+        return monad_list[index] >> \
+            monad_t.return_m(either.Either.Left(index + 1))
+
+    return monad_t.tail_rec_m(step, 0)
 
 
 def map_m(monad_t, transform, from_list):
@@ -122,13 +181,29 @@ def msum(monad_t, monad_list):
 
 def filter_m(monad_t, predicate, filter_list):
     """Generalize the list filter for other monads."""
-    if filter_list == []:
-        return monad_t.return_m([])
-    else:
-        first, rest_orig = filter_list[0], filter_list[1:]
-        return predicate(first) >= (lambda flg:
-               filter_m(monad_t, predicate, rest_orig) >= (lambda rest:
-               monad_t.return_m(rest + first if flg else rest)))
+    filter_list = list(filter_list)
+    if not _provides_tail_rec_m(monad_t):
+        # A left fold of binds keeps the stack flat for strict monads.
+        def keep(kept_m, item):
+            "Binds the test of the next element onto the kept elements."
+            return kept_m >= (lambda kept:
+                   predicate(item) >= (lambda flg:
+                   monad_t.return_m((item, kept) if flg else kept)))
+
+        return func.foldl(keep, monad_t.return_m(None), filter_list) >= \
+            (lambda kept: monad_t.return_m(_from_cons(kept)))
+
+    def step(state):
+        "Tests the next element and conses it if the predicate held."
+        index, kept = state
+        if index == len(filter_list):
+            return monad_t.return_m(either.Either.Right(_from_cons(kept)))
+        item = filter_list[index]
+        return predicate(item) >= (lambda flg:
+               monad_t.return_m(either.Either.Left(
+                   (index + 1, (item, kept) if flg else kept))))
+
+    return monad_t.tail_rec_m(step, (0, None))
 
 
 def for_m(monad_t, from_list, transform):
@@ -152,7 +227,10 @@ mcompr.__doc__ = "Flipped Kleisli composition."
 
 def forever(monad_action):
     "Repeats a monad action infinitely."
-    return monad_action >> forever(monad_action)
+    monad_t = type(monad_action)
+    return monad_t.tail_rec_m(lambda _: monad_action >>
+                              monad_t.return_m(either.Either.Left(None)),
+                              None)
 
 
 def join(monad_of_monads):
@@ -179,7 +257,7 @@ def zip_with_m_(monad_t, zip_function, left, right):
     return sequence_(monad_t, func.zip_with(zip_function, left, right))
 
 
-def fold_m(monad_t, folder, acc, from_list, first=True):
+def fold_m(monad_t, folder, acc, from_list):
     """Like foldl but the result is encapsulated in a monad.
 
     Equivalent to:
@@ -188,13 +266,22 @@ def fold_m(monad_t, folder, acc, from_list, first=True):
         ...
         return folder accm from_listm
     """
-    if first:
-        from_list = list(reversed(from_list))
-    if from_list == []:
-        return monad_t.return_m(acc)
-    else:
-        return folder(acc, from_list.pop()) >= \
-            (lambda fld: fold_m(monad_t, folder, fld, from_list, False))
+    from_list = list(from_list)
+    if not _provides_tail_rec_m(monad_t):
+        # A left fold of binds keeps the stack flat for strict monads.
+        return func.foldl(lambda acc_m, item:
+                          acc_m >= (lambda acc: folder(acc, item)),
+                          monad_t.return_m(acc), from_list)
+
+    def step(state):
+        "Folds in the next element."
+        index, acc = state
+        if index == len(from_list):
+            return monad_t.return_m(either.Either.Right(acc))
+        return folder(acc, from_list[index]) >= (lambda fld:
+               monad_t.return_m(either.Either.Left((index + 1, fld))))
+
+    return monad_t.tail_rec_m(step, (0, acc))
 
 
 def fold_m_(monad_t, folder, acc, from_list):
@@ -233,10 +320,15 @@ def lift_m_n(monad_t, function, *monad_list):
     created a lift_m_n function. This would not be allowed in Haskell's
     type system, which is why it does not exist there.
     """
-    return function(*sequence(monad_t, monad_list))
+    return sequence(monad_t, monad_list) >= (lambda values:
+           monad_t.return_m(function(*values)))
 
 
 def mfilter(monad_t, predicate, monad_action):
     "MonadPlus equivalent of filter for lists."
     return monad_action >= (lambda a:
            monad_t.return_m(a) if predicate else monad_t.mzero())
+
+# Imported last to break the import cycle: either.py imports this module
+# at its top, and everything above only looks up either.Either at call time.
+import either
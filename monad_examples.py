@@ -190,14 +190,44 @@ IO_main = (get_number >= (lambda n:
            handle_IO(IO_sqrt_log(n))))
 
 
+def fused_sqrt(num):
+    """
+    Instead of nesting IO inside Either by hand, we can let IO carry the
+    failure itself. IO.fail_IO skips every bind after it, just like Left.
+    """
+    if num < 0:
+        return IO.fail_IO(
+            "You can't take the square root of a negative number!")
+    else:
+        return IO.IO.Final(num ** 0.5)
+
+
+def fused_log(num):
+    "The same for log. IO.lift_either would also turn either_log into this."
+    if num < 0:
+        return IO.fail_IO("You can't take the log of a negative number!")
+    else:
+        return IO.IO.Final(math.log(num))
+
+fused_main = (get_number >= (lambda n:
+              IO.catch_IO((fused_log(n) >= fused_sqrt) >= (lambda r:
+                          IO.put_line("The sqrt of the log of {} is:"
+                                      .format(n)) >>
+                          IO.put_line("{}".format(r))),
+                          IO.put_line)))
+
+
 def main():
     "Runs each set of examples."
     # Ideally your main() consists of a single call of IO.execute_IO
-    # Since we are really running three programs, we are making three calls
+    # Since we are really running four programs, we are making four calls
     # to IO.execute_IO. You could just chain them together with >>, though.
-    IO.execute_IO(maybe_main)
-    IO.execute_IO(either_main)
-    IO.execute_IO(IO_main)
+    # IO.optimize_IO prints each block of put_lines as a single write. The
+    # optimized programs are cached, so running main() again is cheaper.
+    IO.execute_IO(IO.optimize_IO(maybe_main))
+    IO.execute_IO(IO.optimize_IO(either_main))
+    IO.execute_IO(IO.optimize_IO(IO_main))
+    IO.execute_IO(IO.optimize_IO(fused_main))
 
 if __name__ == '__main__':
     main()
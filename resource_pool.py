@@ -0,0 +1,72 @@
+"""
+A pool of open handles (files, sockets, ...) for the IO interpreter.
+
+IO.execute_IO keeps one ResourcePool for the run of a program. Every
+IO.with_resource action asks it for a handle under a key, and gives the
+handle back when it's done, so repeated actions against the same file
+or socket reuse one open handle instead of opening a new one each time.
+"""
+
+
+class ResourcePool(object):
+    "Keeps idle handles by key and counts how often they are reused."
+
+    def __init__(self, max_idle=8):
+        "max_idle is the most idle handles kept open for any one key."
+        self.max_idle = max_idle
+        self.hits = 0
+        self.misses = 0
+        self.open_handles = 0
+        self._idle = {}
+
+    def acquire(self, key, opener):
+        "Takes an idle handle for key, or opens one with opener()."
+        idle = self._idle.get(key)
+        if idle:
+            self.hits += 1
+            return idle.pop()
+        handle = opener()
+        self.misses += 1
+        self.open_handles += 1
+        return handle
+
+    def release(self, key, handle):
+        "Gives a handle back to the pool, closing it if the pool is full."
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self.max_idle:
+            idle.append(handle)
+        else:
+            self.discard(handle)
+
+    def discard(self, handle):
+        "Closes a handle that should not be reused."
+        self.open_handles -= 1
+        handle.close()
+
+    def close_all(self):
+        "Closes every idle handle."
+        idle, self._idle = self._idle, {}
+        for handles in idle.itervalues():
+            for handle in handles:
+                self.discard(handle)
+
+    @property
+    def hit_rate(self):
+        "The fraction of acquires served by an idle handle."
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def stats(self):
+        "Hits, misses, hit rate, and open and idle handle counts."
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hit_rate,
+                "open_handles": self.open_handles,
+                "idle_handles": sum(len(handles)
+                                    for handles in self._idle.itervalues())}
+
+    def __str__(self):
+        return "ResourcePool({})".format(self.stats())
+
+    def __repr__(self):
+        return str(self)
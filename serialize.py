@@ -0,0 +1,214 @@
+"""
+Compact serialization of Maybe and Either values and of IO programs.
+
+Maybe and Either values are encoded with marshal as a one byte tag and
+the payload. Plain Python data (numbers, strings, and tuples, lists,
+dicts and sets of them) is written as it is; Unit() and nested Maybe
+and Either values have tags of their own, and any other payload is
+pickled. If a container turns out to hold something else, the
+containers in that encode call are pickled instead. Lists of values are
+encoded as one string of tags and one tuple of payloads. marshal's
+format is only stable within one Python version, so this is for talking
+between worker processes, not for storage.
+
+IO programs hold lambdas and cannot be encoded directly. Instead a job
+is a list of (name, args) steps naming actions registered with
+register_action. build_IO turns a decoded job back into an IO program,
+feeding each step the result of the one before it.
+"""
+# pylint: disable=C0103, W0142
+
+import cPickle
+import marshal
+
+import func
+import maybe
+import either
+import IO
+
+NothingTag = "\x00"
+JustTag = "\x01"
+LeftTag = "\x02"
+RightTag = "\x03"
+
+# The kind of payload goes in the high bits of the tag byte.
+PlainPayload = 0
+UnitPayload = 1
+NestedPayload = 2
+PickledPayload = 3
+
+_PLAIN_TYPES = frozenset([int, long, float, complex, bool, str, unicode,
+                          type(None)])
+# marshal writes these only if everything inside them can be written too.
+_CONTAINER_TYPES = frozenset([tuple, list, dict, set, frozenset])
+
+_DECODERS = {
+    NothingTag: lambda _: maybe.Maybe.Nothing(),
+    JustTag: maybe.Maybe.Just,
+    LeftTag: either.Either.Left,
+    RightTag: either.Either.Right,
+}
+
+
+def _pack(payload, pickle_containers):
+    """Turns a payload into something marshal can write, and the kind of
+    payload it was. Unit and nested Maybe and Either values get their own
+    kinds, and other types marshal does not know are pickled. Containers
+    are written as they are unless pickle_containers is set."""
+    payload_type = type(payload)
+    if payload_type in _PLAIN_TYPES:
+        return PlainPayload, payload
+    elif payload_type in _CONTAINER_TYPES and not pickle_containers:
+        return PlainPayload, payload
+    elif payload_type is func.Unit:
+        return UnitPayload, None
+    elif isinstance(payload, (maybe.Maybe, either.Either)):
+        return NestedPayload, _tag_and_payload(payload, pickle_containers)
+    return PickledPayload, cPickle.dumps(payload, 2)
+
+
+def _tag_and_payload(monad_value, pickle_containers=False):
+    "Splits a Maybe or Either into its tag and its packed payload."
+    if isinstance(monad_value, maybe.Maybe):
+        if monad_value.is_nothing:
+            return NothingTag, None
+        tag = JustTag
+    elif isinstance(monad_value, either.Either):
+        if monad_value.EitherT == either.Either.LeftT:
+            tag = LeftTag
+        else:
+            tag = RightTag
+    else:
+        raise TypeError("Can only encode Maybe and Either values, not {}."
+                        .format(type(monad_value).__name__))
+    kind, payload = _pack(monad_value.value, pickle_containers)
+    return chr(ord(tag) | kind << 2), payload
+
+
+def _from_tag_and_payload(tag, payload):
+    "Rebuilds the value _tag_and_payload split up."
+    if tag in _DECODERS:
+        return _DECODERS[tag](payload)
+    kind = ord(tag) >> 2
+    if kind == UnitPayload:
+        payload = func.Unit()
+    elif kind == NestedPayload:
+        payload = _from_tag_and_payload(*payload)
+    elif kind == PickledPayload:
+        payload = cPickle.loads(payload)
+    return _DECODERS[chr(ord(tag) & 3)](payload)
+
+
+def _dumps(split):
+    """marshals split(pickle_containers). If a container held something
+    marshal cannot write, splits again with containers pickled."""
+    try:
+        return marshal.dumps(split(False))
+    except ValueError:
+        return marshal.dumps(split(True))
+
+
+def encode(monad_value):
+    "Encodes a single Maybe or Either value."
+    return _dumps(lambda pickle_containers:
+                  _tag_and_payload(monad_value, pickle_containers))
+
+
+def decode(data):
+    "Decodes a value written by encode."
+    return _from_tag_and_payload(*marshal.loads(data))
+
+
+def encode_many(monad_values):
+    "Encodes a list of Maybe and Either values in one go."
+    def split(pickle_containers):
+        "One string of tags and one tuple of payloads."
+        if not monad_values:
+            return "", ()
+        tags, payloads = zip(*[_tag_and_payload(value, pickle_containers)
+                               for value in monad_values])
+        return "".join(tags), payloads
+    return _dumps(split)
+
+
+def decode_many(data):
+    "Decodes a list written by encode_many."
+    tags, payloads = marshal.loads(data)
+    decoders = _DECODERS
+    return [decoders[tag](payload) if tag in decoders
+            else _from_tag_and_payload(tag, payload)
+            for tag, payload in zip(tags, payloads)]
+
+
+# Serializable IO programs
+
+ACTIONS = {}
+
+
+def register_action(name):
+    """
+    Decorator registering an IO action under name, so that jobs can refer
+    to it. The action is called as action(previous_result, *args) and
+    must return an IO.
+
+    >>> @register_action("shout")
+    ... def shout(_, text):
+    ...     return IO.put_line(text.upper())
+    """
+    def register(action):
+        "Adds the action to the registry."
+        if name in ACTIONS:
+            raise ValueError("An action named {} is already registered."
+                             .format(name))
+        ACTIONS[name] = action
+        return action
+    return register
+
+
+register_action("put_line")(lambda _, string: IO.put_line(string))
+register_action("get_line")(lambda _: IO.get_line())
+register_action("put_result")(lambda result: IO.put_line(result))
+register_action("fail")(lambda _, error: IO.fail_IO(error))
+
+
+def _check_job(steps):
+    "Normalizes steps to (name, args) tuples, checking every name exists."
+    checked = []
+    for name, args in steps:
+        if name not in ACTIONS:
+            raise ValueError("No IO action named {} is registered."
+                             .format(name))
+        checked.append((name, tuple(args)))
+    return checked
+
+
+def encode_job(steps):
+    "Encodes a job, a list of (action name, args) steps."
+    return marshal.dumps(tuple(_check_job(steps)))
+
+
+def decode_job(data):
+    "Decodes a job written by encode_job."
+    return _check_job(marshal.loads(data))
+
+
+def build_IO(steps):
+    """Turns a job into an IO program that runs each step in order and
+    returns the result of the last one."""
+    actions = [(ACTIONS[name], args) for name, args in _check_job(steps)]
+
+    def step(state):
+        "Runs the next action on the previous result."
+        index, result = state
+        if index == len(actions):
+            return IO.IO.Final(either.Either.Right(result))
+        action, args = actions[index]
+        return action(result, *args) >= (lambda new_result:
+               IO.IO.Final(either.Either.Left((index + 1, new_result))))
+
+    return IO.IO.tail_rec_m(step, (0, func.Unit()))
+
+
+def execute_job(data):
+    "Decodes a job and runs it with IO.execute_IO."
+    return IO.execute_IO(build_IO(decode_job(data)))
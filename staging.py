@@ -0,0 +1,115 @@
+"""
+Staging of fixed Kleisli pipelines into plain Python functions.
+
+A pipeline like:
+    lambda x: (stage1(x) >= stage2) >= stage3
+
+walks through a bind, a closure and (for Maybe) a fresh Nothing for
+every stage. When the stages are known up front, compile_pipeline
+generates a single function that calls each stage in turn, checks the
+tag of its result inline and returns early on the first failure:
+
+    def pipeline(value):
+        result = stage0(value)
+        if result.__class__ is not monad_t:
+            return finish(result, 1)
+        if result.EitherT != 1:
+            return result
+        result = stage1(result.value)
+        ...
+        return result
+
+The compiled function gives the same results as the equivalent >= chain.
+A stage that returns some other monad (a Nothing in an Either pipeline,
+say) hands the rest of the pipeline to ordinary binds, just as the chain
+would. Monads without a registered tag check fall back to Kleisli
+composition.
+"""
+# pylint: disable=C0103, W0122
+
+import func
+import monad
+import maybe
+import either
+
+
+# monad_t -> (tag attribute, success tag, value attribute)
+TAG_CHECKS = {
+    maybe.Maybe: ("_maybe_type", maybe.Maybe.JustType, "_value"),
+    either.Either: ("EitherT", either.Either.RightT, "value"),
+}
+
+
+def register_tag_check(monad_t, tag_attr, success_tag, value_attr):
+    """Lets compile_pipeline inline binds for monad_t. Values of monad_t
+    must continue iff getattr(m, tag_attr) == success_tag, and carry their
+    value in value_attr when they do."""
+    TAG_CHECKS[monad_t] = (tag_attr, success_tag, value_attr)
+
+
+def _tag_check(monad_t):
+    "Finds the tag check for monad_t or its nearest registered base."
+    for klass in monad_t.__mro__:
+        if klass in TAG_CHECKS:
+            return TAG_CHECKS[klass]
+    return None
+
+
+def pipeline_source(monad_t, stage_count):
+    "The source of the function compile_pipeline generates."
+    tag_attr, success_tag, value_attr = _tag_check(monad_t)
+    lines = ["def pipeline(value):",
+             "    result = stage0(value)"]
+    for index in xrange(1, stage_count):
+        lines.append("    if result.__class__ is not monad_t:")
+        lines.append("        return finish(result, {})".format(index))
+        lines.append("    if result.{} != {!r}:".format(tag_attr, success_tag))
+        lines.append("        return result")
+        lines.append("    result = stage{}(result.{})".format(index,
+                                                           value_attr))
+    lines.append("    return result")
+    return "\n".join(lines) + "\n"
+
+
+def compile_pipeline(monad_t, *stages):
+    """
+    Compiles stages (functions a -> monad_t(b)) into one function
+    equivalent to stage0 |mcompl| stage1 |mcompl| ... |mcompl| stageN.
+
+    >>> f = compile_pipeline(Maybe, safe_log, safe_sqrt)
+    >>> f(10)
+    Just(1.51742712939)
+    """
+    if not stages:
+        raise ValueError("A pipeline needs at least one stage.")
+
+    if _tag_check(monad_t) is None:
+        return func.foldl(monad.mcompl, stages[0], stages[1:])
+
+    def finish(result, index):
+        "Binds the stages from index on the slow way."
+        return func.foldl(lambda m, stage: m >= stage, result, stages[index:])
+
+    namespace = dict(("stage{}".format(index), stage)
+                     for index, stage in enumerate(stages))
+    namespace.update(monad_t=monad_t, finish=finish)
+    exec(pipeline_source(monad_t, len(stages)), namespace)
+    return namespace["pipeline"]
+
+
+def benchmark(iterations=200000):
+    "Times a compiled pipeline against the equivalent >= chain."
+    import timeit
+    import monad_examples
+
+    stages = [monad_examples.either_log, monad_examples.either_sqrt,
+              monad_examples.either_log, monad_examples.either_sqrt]
+    chained = func.foldl(monad.mcompl, stages[0], stages[1:])
+    compiled = compile_pipeline(either.Either, *stages)
+
+    for name, pipeline in (("bind chain", chained), ("compiled", compiled)):
+        seconds = timeit.timeit(lambda: pipeline(1e6), number=iterations)
+        print "{:>10}: {:.3f}s for {} runs".format(name, seconds, iterations)
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,187 @@
+"""
+Implementation of a Task monad for I/O-bound Either pipelines.
+
+A Task is a deferred computation that results in an Either, like
+ExceptT e IO from Haskell: nothing happens until run_task() is called,
+and a Left skips every bind after it. Binds may return a Task, an Either
+or a Maybe, so existing validators can be used as they are.
+
+gather_m runs independent tasks at the same time on a bounded number of
+threads, so a batch of remote lookups costs about as long as the
+slowest few rather than the sum of all of them.
+"""
+# pylint: disable=C0103, W0142, W0703
+
+import sys
+import threading
+import Queue
+
+import monad
+import func
+import maybe
+import either
+
+DEFAULT_LIMIT = 16
+
+
+@monad.monadize
+class Task(monad.Monad):
+    "A deferred computation resulting in an Either. Run using run_task()"
+
+    def __init__(self, thunk, source=None, bindee=None):
+        """Should not be called directly. A Task either calls thunk, or
+        (made by bind) runs source and then bindee on its result."""
+        self.thunk = thunk
+        self.source = source
+        self.bindee = bindee
+
+    def run(self):
+        """Runs the task and returns its Either result. Chains of binds are
+        run with a loop and a stack of bindees, not by nesting calls."""
+        bindees = []
+        task = self
+        while True:
+            while task.bindee is not None:
+                bindees.append(task.bindee)
+                task = task.source
+            result = task.thunk()
+            if not bindees or result.EitherT == either.Either.LeftT:
+                return result
+            task = to_task(bindees.pop()(result.value))
+
+    @classmethod
+    def Right(cls, value):
+        "A Task that succeeds with value."
+        return cls(lambda: either.Either.Right(value))
+
+    @classmethod
+    def Left(cls, error):
+        "A Task that fails with error."
+        return cls(lambda: either.Either.Left(error))
+
+    @classmethod
+    def attempt(cls, function, *args):
+        """A Task that calls function(*args) when run. An exception
+        becomes a Left, an Either or Maybe result is used as it is and
+        anything else becomes a Right."""
+        def run():
+            "Calls function, catching its exceptions."
+            try:
+                result = function(*args)
+            except Exception as error:
+                return either.Either.Left(error)
+            return to_task(result).run()
+        return cls(run)
+
+    def bind(self, bindee):
+        return Task(None, self, bindee)
+
+    @classmethod
+    def return_m(cls, value):
+        return cls.Right(value)
+
+    @classmethod
+    def tail_rec_m(cls, step, seed):
+        def run():
+            "Runs step until it gives back a Right."
+            state = seed
+            while True:
+                result = to_task(step(state)).run()
+                if result.EitherT == either.Either.LeftT:
+                    return result
+                result = result.value
+                if result.EitherT == either.Either.LeftT:
+                    state = result.value
+                else:
+                    return either.Either.Right(result.value)
+        return cls(run)
+
+    def __str__(self):
+        if self.bindee is not None:
+            return "Task({} >= {})".format(self.source, self.bindee.__name__)
+        return "Task({})".format(self.thunk.__name__)
+
+    def __repr__(self):
+        return str(self)
+
+
+def to_task(value):
+    """Lifts an Either or Maybe into a Task. A Nothing becomes
+    Left(Unit()). Tasks are returned unchanged."""
+    if isinstance(value, Task):
+        return value
+    elif isinstance(value, either.Either):
+        return Task(lambda: value)
+    elif isinstance(value, maybe.Maybe):
+        if value.is_just:
+            return Task.Right(value.value)
+        return Task.Left(func.Unit())
+    raise TypeError("Expected a Task, Either or Maybe, not {}."
+                    .format(type(value).__name__))
+
+
+def run_task(task):
+    "Runs a Task and returns its Either result."
+    return task.run()
+
+
+def gather_m(tasks, limit=DEFAULT_LIMIT):
+    """
+    Like monad.sequence(Task, tasks), but runs the tasks concurrently on
+    at most limit threads. Results keep the order of tasks. Once a task
+    gives a Left no more tasks are started, and the first Left in order
+    is the result. An exception raised by a task is re-raised by run.
+    """
+    tasks = list(tasks)
+    if limit < 1:
+        raise ValueError("limit must be at least 1.")
+
+    def run():
+        "Runs the tasks on a pool of worker threads."
+        results = [None] * len(tasks)
+        errors = []
+        pending = Queue.Queue()
+        for index in xrange(len(tasks)):
+            pending.put(index)
+        failed = threading.Event()
+
+        def worker():
+            "Runs tasks until there are none left or one has failed."
+            while not failed.is_set():
+                try:
+                    index = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    results[index] = tasks[index].run()
+                except Exception:
+                    errors.append(sys.exc_info())
+                    failed.set()
+                    return
+                if results[index].EitherT == either.Either.LeftT:
+                    failed.set()
+
+        workers = [threading.Thread(target=worker)
+                   for _ in xrange(min(limit, len(tasks)))]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        if errors:
+            raise errors[0][0], errors[0][1], errors[0][2]
+        # Tasks are started in order, so every task before a Left has run.
+        values = []
+        for result in results:
+            if result.EitherT == either.Either.LeftT:
+                return result
+            values.append(result.value)
+        return either.Either.Right(values)
+
+    return Task(run)
+
+
+def traverse_m(transform, from_list, limit=DEFAULT_LIMIT):
+    """Maps transform (returning a Task, Either or Maybe) over from_list
+    and gathers the results concurrently."""
+    return gather_m([Task.attempt(transform, a) for a in from_list], limit)
@@ -0,0 +1,189 @@
+"""
+Tests for the IO monad and its interpreter in IO.py.
+"""
+# pylint: disable=C0103, R0904
+
+import os
+import sys
+import tempfile
+import unittest
+from StringIO import StringIO
+
+import IO
+import monad
+import monad_examples
+
+
+def run_with_input(IO_action, lines=(), runner=IO.execute_IO):
+    """Runs IO_action with runner on the given input lines, returning what
+    it printed and what runner returned."""
+    old_stdin, old_stdout = sys.stdin, sys.stdout
+    sys.stdin = StringIO("".join(line + "\n" for line in lines))
+    sys.stdout = StringIO()
+    try:
+        result = runner(IO_action)
+        return sys.stdout.getvalue(), result
+    finally:
+        sys.stdin, sys.stdout = old_stdin, old_stdout
+
+
+def outputs(IO_action):
+    "The Outputs at the head of IO_action."
+    found = []
+    while IO_action.IOtype == IO.IO.OutputT:
+        found.append(IO_action.output)
+        IO_action = IO_action.followup
+    return found
+
+
+class TestOptimize(unittest.TestCase):
+    "optimize_IO"
+
+    def test_coalesces_outputs(self):
+        program = IO.put_line("a") >> IO.put_line("b") >> IO.put_line(1)
+        self.assertEqual(outputs(IO.optimize_IO(program)), ["a\nb", 1])
+
+    def test_output_is_unchanged(self):
+        for number in ("10", "0.5", "-2"):
+            for program in (monad_examples.maybe_main,
+                            monad_examples.either_main,
+                            monad_examples.fused_main):
+                self.assertEqual(
+                    run_with_input(IO.optimize_IO(program), [number]),
+                    run_with_input(program, [number]))
+
+    def test_optimized_program_is_cached(self):
+        optimized = IO.optimize_IO(monad_examples.maybe_main)
+        self.assertTrue(IO.optimize_IO(monad_examples.maybe_main) is optimized)
+        self.assertTrue(IO.optimize_IO(optimized) is optimized)
+
+    def test_outputs_after_catch_are_coalesced(self):
+        program = IO.optimize_IO(
+            IO.catch_IO(IO.get_line(), IO.put_line) >>
+            IO.put_line("a") >> IO.put_line("b"))
+        rest = program.followup(None)
+        self.assertEqual(outputs(rest), ["a\nb"])
+
+
+class TestFailure(unittest.TestCase):
+    "IO.Fail, catch_IO and the run_*_IO functions."
+
+    def test_fail_short_circuits(self):
+        program = IO.put_line("a") >> IO.fail_IO("bad") >> IO.put_line("b")
+        printed, result = run_with_input(program, runner=IO.run_either_IO)
+        self.assertEqual(printed, "a\n")
+        self.assertEqual(str(result), "Left(bad)")
+
+    def test_catch(self):
+        program = IO.catch_IO(IO.fail_IO(1), lambda e: IO.IO.Final(e + 1))
+        self.assertEqual(IO.execute_IO(program), 2)
+
+    def test_retry_loop_is_stack_safe(self):
+        attempts = [0]
+
+        def attempt():
+            "Fails until the 20000th attempt."
+            attempts[0] += 1
+            if attempts[0] < 20000:
+                return IO.fail_IO(attempts[0])
+            return IO.IO.Final("done")
+
+        def retry():
+            "Attempts until it works."
+            return IO.catch_IO(IO.IO.Suspend(attempt), lambda e: retry())
+
+        self.assertEqual(IO.execute_IO(retry() >= IO.IO.Final), "done")
+        self.assertEqual(attempts[0], 20000)
+
+    def test_nested_catches(self):
+        inner = IO.catch_IO(IO.fail_IO("inner"),
+                            lambda e: IO.fail_IO(e + " rethrown"))
+        outer = IO.catch_IO(inner >= (lambda x: IO.IO.Final("skipped")),
+                            lambda e: IO.IO.Final("caught " + e))
+        self.assertEqual(IO.execute_IO(outer), "caught inner rethrown")
+
+        recovered = IO.catch_IO(
+            IO.catch_IO(IO.fail_IO(1), lambda e: IO.IO.Final(e + 1)) >=
+            (lambda x: IO.IO.Final(x * 10)),
+            lambda e: IO.IO.Final("outer"))
+        self.assertEqual(IO.execute_IO(recovered), 20)
+
+    def test_catch_followup_runs_after_handler(self):
+        program = IO.catch_IO(IO.fail_IO(1), lambda e: IO.IO.Final(e)) >= \
+            (lambda x: IO.IO.Final(x + 1))
+        self.assertEqual(IO.execute_IO(IO.catch_IO(program, IO.IO.Final)), 2)
+
+
+class TestResources(unittest.TestCase):
+    "bracket and with_resource."
+
+    def test_bracket_releases_on_failure_and_exception(self):
+        released = []
+        release = lambda r: IO.perform(lambda: released.append(r))
+
+        def explode(_):
+            "Raises instead of returning an IO."
+            raise RuntimeError("explode")
+
+        program = IO.bracket(IO.IO.Final("a"), release,
+                             lambda r: IO.fail_IO("bad"))
+        self.assertEqual(str(IO.run_either_IO(program)), "Left(bad)")
+        self.assertRaises(RuntimeError, IO.execute_IO,
+                          IO.bracket(IO.IO.Final("b"), release, explode))
+        self.assertEqual(released, ["a", "b"])
+
+    def test_pool_discards_handle_after_exception(self):
+        class Handle(object):
+            "A handle that records being closed."
+            closed = False
+
+            def close(self):
+                "Closes the handle."
+                self.closed = True
+
+        def explode(_):
+            "Raises instead of returning an IO."
+            raise RuntimeError("explode")
+
+        handle = Handle()
+        pool = IO.ResourcePool()
+        self.assertRaises(RuntimeError, IO.execute_IO,
+                          IO.with_resource("key", lambda: handle, explode),
+                          pool=pool)
+        self.assertTrue(handle.closed)
+        self.assertEqual(pool.stats()["open_handles"], 0)
+
+    def test_truncating_files_are_not_pooled(self):
+        path = tempfile.mktemp()
+        try:
+            pool = IO.ResourcePool()
+            write = lambda data: IO.with_file(
+                path, "w", lambda handle: IO.write_handle(handle, data))
+            IO.execute_IO(write("a") >> write("b"), pool=pool)
+            with open(path) as written:
+                self.assertEqual(written.read(), "b")
+            self.assertEqual(pool.stats()["open_handles"], 0)
+
+            append = lambda data: IO.with_file(
+                path, "a", lambda handle: IO.write_handle(handle, data))
+            read = IO.with_file(path, "r", IO.read_handle)
+            contents = IO.execute_IO(append("c") >> append("d") >> read >>
+                                     read, pool=pool)
+            self.assertEqual(contents, "bcd")
+            self.assertEqual(pool.hits, 2)
+            pool.close_all()
+        finally:
+            os.remove(path)
+
+    def test_pool_reuses_handles(self):
+        pool = IO.ResourcePool()
+        use = lambda h: IO.IO.Final(h)
+        program = monad.sequence(IO.IO, [IO.with_resource("key", object, use)
+                                         for _ in range(10)])
+        handles = IO.execute_IO(program, pool=pool)
+        self.assertEqual(len(set(handles)), 1)
+        self.assertEqual(pool.hit_rate, 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests for the applicative functions in applicative.py.
+"""
+# pylint: disable=C0103, R0904
+
+import unittest
+
+import applicative
+import IO
+from maybe import Maybe
+from either import Either
+from validation import Validation
+
+
+def positive(x):
+    "Validates that x is positive."
+    if x > 0:
+        return Validation.Success(x)
+    return Validation.Failure("{} is not positive".format(x))
+
+
+class TestValidation(unittest.TestCase):
+    "Validation collects the errors of every Failure."
+
+    def test_collects_every_error(self):
+        result = applicative.traverse_a(Validation, positive, [1, -2, 3, -4])
+        self.assertTrue(result.is_failure)
+        self.assertEqual(result.value, ["-2 is not positive",
+                                        "-4 is not positive"])
+
+    def test_lift_a_n_collects_errors(self):
+        result = applicative.lift_a_n(Validation, lambda a, b: a + b,
+                                      Validation.Failure("a", "b"),
+                                      Validation.Failure("c"))
+        self.assertEqual(result.value, ["a", "b", "c"])
+
+    def test_success(self):
+        result = applicative.lift_a_n(Validation, lambda a, b: a + b,
+                                      positive(1), positive(2))
+        self.assertTrue(result.is_success)
+        self.assertEqual(result.value, 3)
+
+
+class TestShortCircuit(unittest.TestCase):
+    "Maybe and Either stop at the first failure."
+
+    def test_traverse_a_stops_calling_transform(self):
+        seen = []
+
+        def check(x):
+            "Fails on odd numbers, remembering what it was called on."
+            seen.append(x)
+            return Either.Right(x) if x % 2 == 0 else Either.Left(x)
+
+        result = applicative.traverse_a(Either, check, [0, 2, 3, 4, 5])
+        self.assertEqual(str(result), "Left(3)")
+        self.assertEqual(seen, [0, 2, 3])
+
+    def test_maybe(self):
+        result = applicative.sequence_a(Maybe, [Maybe.Just(1),
+                                                Maybe.Nothing(),
+                                                Maybe.Just(3)])
+        self.assertTrue(result.is_nothing)
+
+    def test_ap(self):
+        result = applicative.ap(Maybe, Maybe.Just(lambda x: x * 2),
+                                Maybe.Just(21))
+        self.assertEqual(result.value, 42)
+
+
+class TestFallback(unittest.TestCase):
+    "Other applicatives go through monad.sequence."
+
+    def test_IO_runs_in_order(self):
+        program = applicative.lift_a_n(IO.IO, lambda a, b: a + b,
+                                       IO.IO.Final(1), IO.IO.Final(2))
+        self.assertEqual(IO.execute_IO(program), 3)
+
+    def test_IO_sequence_a_is_stack_safe(self):
+        program = applicative.sequence_a(IO.IO, [IO.IO.Final(i)
+                                                 for i in range(20000)])
+        self.assertEqual(IO.execute_IO(program), range(20000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for the Control.Monad helpers in monad.py.
+"""
+# pylint: disable=C0103, R0904
+
+import unittest
+
+import monad
+import func
+from maybe import Maybe
+from either import Either
+
+
+@monad.monadize
+class Identity(monad.Monad):
+    "A strict user-defined monad that does not override tail_rec_m."
+
+    def __init__(self, value):
+        self.value = value
+
+    def bind(self, bindee):
+        return bindee(self.value)
+
+    @classmethod
+    def return_m(cls, value):
+        return cls(value)
+
+
+class TestSequence(unittest.TestCase):
+    "sequence and friends, for monads with and without tail_rec_m."
+
+    def test_user_monad_sequence_is_stack_safe(self):
+        result = monad.sequence(Identity, [Identity(i) for i in range(20000)])
+        self.assertEqual(result.value, range(20000))
+
+    def test_user_monad_sequence__is_stack_safe(self):
+        result = monad.sequence_(Identity,
+                                 [Identity(i) for i in range(20000)])
+        self.assertEqual(result.value, func.Unit())
+
+    def test_user_monad_fold_m_is_stack_safe(self):
+        result = monad.fold_m(Identity, lambda acc, x: Identity(acc + x),
+                              0, range(20000))
+        self.assertEqual(result.value, sum(range(20000)))
+
+    def test_user_monad_filter_m_is_stack_safe(self):
+        result = monad.filter_m(Identity, lambda x: Identity(x % 3 == 0),
+                                range(20000))
+        self.assertEqual(result.value, range(0, 20000, 3))
+
+    def test_user_monad_tail_rec_m_default(self):
+        result = Identity.tail_rec_m(
+            lambda n: Identity(Either.Left(n + 1) if n < 10
+                               else Either.Right(n)), 0)
+        self.assertEqual(result.value, 10)
+
+    def test_maybe_sequence_is_stack_safe(self):
+        result = monad.sequence(Maybe, [Maybe.Just(i) for i in range(20000)])
+        self.assertEqual(result.value, range(20000))
+
+    def test_sequence_short_circuits(self):
+        result = monad.sequence(Either, [Either.Right(1), Either.Left("a"),
+                                         Either.Left("b")])
+        self.assertEqual(str(result), "Left(a)")
+
+    def test_fold_m_is_stack_safe(self):
+        result = monad.fold_m(Either, lambda acc, x: Either.Right(acc + x),
+                              0, range(20000))
+        self.assertEqual(result.value, sum(range(20000)))
+
+    def test_filter_m_keeps_order(self):
+        result = monad.filter_m(Maybe, lambda x: Maybe.Just(x % 2 == 0),
+                                range(10))
+        self.assertEqual(result.value, [0, 2, 4, 6, 8])
+
+
+class TestLift(unittest.TestCase):
+    "lift_m_n returns its result in the monad."
+
+    def test_lift_m_n_returns_monad(self):
+        result = monad.lift_m_n(Maybe, lambda a, b: a + b,
+                                Maybe.Just(1), Maybe.Just(2))
+        self.assertTrue(result.is_just)
+        self.assertEqual(result.value, 3)
+
+    def test_lift_m_n_short_circuits(self):
+        result = monad.lift_m_n(Either, lambda a, b: a + b,
+                                Either.Left("a"), Either.Right(2))
+        self.assertEqual(str(result), "Left(a)")
+
+
+if __name__ == '__main__':
+    unittest.main()
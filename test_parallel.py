@@ -0,0 +1,97 @@
+"""
+Tests for par_map_m in parallel.py.
+"""
+# pylint: disable=C0103, R0904
+
+import multiprocessing
+import unittest
+
+import monad
+import parallel
+from maybe import Maybe
+from either import Either
+
+
+def validate(row):
+    "Left for negative rows, else Right the row doubled."
+    if row < 0:
+        return Either.Left("negative: {}".format(row))
+    return Either.Right(row * 2)
+
+
+def positive(row):
+    "Nothing for negative rows, else Just the row."
+    return Maybe.Nothing() if row < 0 else Maybe.Just(row)
+
+
+class CountingPool(object):
+    "Runs jobs in this process, counting how many are in flight at once."
+
+    def __init__(self, processes):
+        self._processes = processes
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    def apply_async(self, function, args):
+        "Runs function now and hands back its result on get()."
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        result = function(*args)
+        pool = self
+
+        class Result(object):
+            "Like multiprocessing's AsyncResult."
+            @staticmethod
+            def get():
+                "The result of the job."
+                pool.in_flight -= 1
+                return result
+        return Result()
+
+
+class TestParMapM(unittest.TestCase):
+    "par_map_m gives the same results as map_m."
+
+    rows = range(500)
+    failing_rows = range(100) + [-1] + range(300) + [-2] + range(50)
+
+    def assert_same(self, monad_t, transform, rows, **kwargs):
+        "par_map_m and map_m agree on rows."
+        self.assertEqual(
+            str(parallel.par_map_m(monad_t, transform, rows, **kwargs)),
+            str(monad.map_m(monad_t, transform, rows)))
+
+    def test_results_in_order(self):
+        self.assert_same(Either, validate, self.rows, chunk_size=7)
+
+    def test_leftmost_left(self):
+        for chunk_size in (1, 7, 1000):
+            self.assert_same(Either, validate, self.failing_rows,
+                             chunk_size=chunk_size)
+
+    def test_nothing(self):
+        self.assert_same(Maybe, positive, self.failing_rows, chunk_size=13)
+
+    def test_empty(self):
+        self.assert_same(Either, validate, [])
+
+    def test_shared_pool_is_left_running(self):
+        pool = multiprocessing.Pool(2)
+        try:
+            self.assert_same(Either, validate, self.failing_rows, pool=pool,
+                             processes=2, chunk_size=5)
+            self.assert_same(Either, validate, self.rows, pool=pool,
+                             processes=2)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def test_processes_defaults_to_pool_size(self):
+        pool = CountingPool(3)
+        self.assert_same(Either, validate, self.rows, pool=pool,
+                         chunk_size=10)
+        self.assertEqual(pool.most_in_flight, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
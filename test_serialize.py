@@ -0,0 +1,69 @@
+"""
+Tests for the encodings in serialize.py.
+"""
+# pylint: disable=C0103, R0904
+
+import collections
+import unittest
+
+import monad
+import func
+import serialize
+import IO
+from maybe import Maybe
+from either import Either
+
+
+Point = collections.namedtuple("Point", "x y")
+
+VALUES = [Maybe.Nothing(), Maybe.Just(1), Either.Left("bad"),
+          Either.Right([1, 2.5, u"x", (None, True)]),
+          Maybe.Just(func.Unit()), monad.guard(Maybe, True),
+          monad.sequence_(Either, [Either.Right(1)]),
+          Either.Right(Maybe.Just(1)), Maybe.Just(Either.Left(Maybe.Nothing())),
+          Either.Right([Maybe.Just(1), func.Unit()])]
+
+
+class TestValues(unittest.TestCase):
+    "Round trips of Maybe and Either values."
+
+    def test_encode_round_trip(self):
+        for value in VALUES:
+            self.assertEqual(str(serialize.decode(serialize.encode(value))),
+                             str(value))
+
+    def test_encode_many_round_trip(self):
+        decoded = serialize.decode_many(serialize.encode_many(VALUES))
+        self.assertEqual(map(str, decoded), map(str, VALUES))
+
+    def test_encode_many_empty(self):
+        self.assertEqual(serialize.decode_many(serialize.encode_many([])), [])
+
+    def test_non_marshal_payloads_are_pickled(self):
+        for value in (Either.Right(Point(1, 2)),
+                      Either.Right([1, {"p": Point(3, 4)}]),
+                      Maybe.Just(frozenset([1, 2]))):
+            decoded = serialize.decode(serialize.encode(value))
+            self.assertEqual(decoded.value, value.value)
+            self.assertEqual(type(decoded.value), type(value.value))
+
+    def test_only_maybe_and_either(self):
+        self.assertRaises(TypeError, serialize.encode, 1)
+
+
+class TestJobs(unittest.TestCase):
+    "Encoded IO jobs."
+
+    def test_job_round_trip(self):
+        job = serialize.encode_job([("fail", ("boom",)),
+                                    ("put_line", ("never",))])
+        result = IO.run_either_IO(serialize.build_IO(
+            serialize.decode_job(job)))
+        self.assertEqual(str(result), "Left(boom)")
+
+    def test_unknown_action(self):
+        self.assertRaises(ValueError, serialize.encode_job, [("nope", ())])
+
+
+if __name__ == '__main__':
+    unittest.main()
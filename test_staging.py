@@ -0,0 +1,103 @@
+"""
+Tests for the pipeline compiler in staging.py.
+"""
+# pylint: disable=C0103, R0904
+
+import unittest
+
+import func
+import monad
+import staging
+from maybe import Maybe
+from either import Either
+
+
+def chain(*stages):
+    "The >= chain compile_pipeline should match."
+    return func.foldl(monad.mcompl, stages[0], stages[1:])
+
+
+def stages_failing_at(monad_t, failing, count=4):
+    "count stages adding one each, the stage at index failing failing."
+    def stage(index):
+        "The stage at index."
+        def run(x):
+            "Adds one, or fails."
+            if index == failing:
+                return Maybe.Nothing() if monad_t is Maybe \
+                    else Either.Left("stage {}".format(index))
+            return monad_t.return_m(x + 1)
+        return run
+    return [stage(index) for index in range(count)]
+
+
+@monad.monadize
+class Box(monad.Monad):
+    "A monad without a registered tag check."
+
+    def __init__(self, value):
+        self.ok = True
+        self.value = value
+
+    def bind(self, bindee):
+        return bindee(self.value)
+
+    @classmethod
+    def return_m(cls, value):
+        return cls(value)
+
+
+class TestCompilePipeline(unittest.TestCase):
+    "compile_pipeline gives the same results as the bind chain."
+
+    def test_matches_chain_at_every_failure(self):
+        for monad_t in (Maybe, Either):
+            for failing in range(-1, 4):
+                stages = stages_failing_at(monad_t, failing)
+                expected = chain(*stages)(0)
+                result = staging.compile_pipeline(monad_t, *stages)(0)
+                self.assertEqual(str(result), str(expected))
+                self.assertEqual(type(result), type(expected))
+
+    def test_single_stage(self):
+        stage = lambda x: Maybe.Just(x * 2)
+        self.assertEqual(
+            staging.compile_pipeline(Maybe, stage)(21).value, 42)
+
+    def test_no_stages(self):
+        self.assertRaises(ValueError, staging.compile_pipeline, Maybe)
+
+    def test_stage_returning_another_monad(self):
+        stages = [lambda x: Either.Right(x + 1),
+                  lambda x: Maybe.Nothing(),
+                  lambda x: Either.Right(x + 1)]
+        result = staging.compile_pipeline(Either, *stages)(0)
+        self.assertTrue(result.is_nothing)
+        self.assertEqual(str(result), str(chain(*stages)(0)))
+
+        stages[1] = lambda x: Maybe.Just(x * 10)
+        stages.append(lambda x: Maybe.Just(x + 1))
+        result = staging.compile_pipeline(Either, *stages)(0)
+        self.assertEqual(str(result), str(chain(*stages)(0)))
+
+
+class TestTagChecks(unittest.TestCase):
+    "Monads without a tag check fall back, registered ones compile."
+
+    def tearDown(self):
+        staging.TAG_CHECKS.pop(Box, None)
+
+    def test_unregistered_monad_falls_back(self):
+        stages = [lambda x: Box(x + 1), lambda x: Box(x * 2)]
+        self.assertEqual(staging.compile_pipeline(Box, *stages)(1).value, 4)
+
+    def test_registered_monad_compiles(self):
+        staging.register_tag_check(Box, "ok", True, "value")
+        stages = [lambda x: Box(x + 1), lambda x: Box(x * 2)]
+        self.assertTrue("stage1(result.value)"
+                        in staging.pipeline_source(Box, len(stages)))
+        self.assertEqual(staging.compile_pipeline(Box, *stages)(1).value, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests for the Task monad in task.py, against a local TCP server that
+answers each request after a fixed delay, standing in for a remote
+lookup service.
+"""
+# pylint: disable=C0103, R0904
+
+import socket
+import threading
+import time
+import unittest
+import SocketServer
+
+import monad
+import task
+from maybe import Maybe
+from either import Either
+
+DELAY = 0.05
+
+
+class SlowEchoHandler(SocketServer.BaseRequestHandler):
+    "Sends back the request upper-cased after DELAY seconds."
+
+    def handle(self):
+        request = self.request.recv(1024)
+        time.sleep(DELAY)
+        self.request.sendall(request.upper())
+
+
+class SlowEchoServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+    "A threaded SlowEchoHandler server."
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 256
+
+
+class TestTask(unittest.TestCase):
+    "Task against a slow local server."
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = SlowEchoServer(("127.0.0.1", 0), SlowEchoHandler)
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def lookup(self, row):
+        "Asks the server about row. Rows starting with 'x' are invalid."
+        connection = socket.create_connection(self.server.server_address)
+        try:
+            connection.sendall(row)
+            answer = connection.recv(1024)
+        finally:
+            connection.close()
+        if row.startswith("x"):
+            return Either.Left("invalid " + row)
+        return Either.Right(answer)
+
+    def test_results_in_order(self):
+        rows = ["r{}".format(i) for i in range(40)]
+        result = task.run_task(task.traverse_m(self.lookup, rows, 8))
+        self.assertEqual(result.value, [row.upper() for row in rows])
+
+    def test_first_left_in_order(self):
+        rows = ["r1", "x1", "r2", "x2", "r3"]
+        result = task.run_task(task.traverse_m(self.lookup, rows, 4))
+        self.assertEqual(str(result), "Left(invalid x1)")
+
+    def test_no_tasks_start_after_a_left(self):
+        started = []
+
+        def lookup(row):
+            "Records that row was started."
+            started.append(row)
+            return self.lookup(row)
+
+        rows = ["r1", "x1", "r2", "r3", "r4"]
+        task.run_task(task.traverse_m(lookup, rows, 1))
+        self.assertEqual(started, ["r1", "x1"])
+
+    def test_exception_is_reraised(self):
+        def broken():
+            "Fails with an exception."
+            raise KeyError("broken")
+        gathered = task.gather_m([task.Task.Right(1), task.Task(broken)])
+        self.assertRaises(KeyError, task.run_task, gathered)
+
+    def test_throughput_scales_with_concurrency(self):
+        rows = ["r{}".format(i) for i in range(20)]
+        timings = []
+        for limit in (1, 20):
+            start = time.time()
+            task.run_task(task.traverse_m(self.lookup, rows, limit))
+            timings.append(time.time() - start)
+        self.assertGreater(timings[0], len(rows) * DELAY)
+        self.assertLess(timings[1], timings[0] / 4)
+
+
+class TestBind(unittest.TestCase):
+    "Task as a monad."
+
+    def test_interoperates_with_maybe_and_either(self):
+        result = task.run_task(
+            (task.Task.Right(1) >= (lambda x: Maybe.Just(x + 1))) >=
+            (lambda x: Either.Right(x * 10)))
+        self.assertEqual(str(result), "Right(20)")
+        nothing = task.run_task(task.Task.Right(1) >=
+                                (lambda x: Maybe.Nothing()))
+        self.assertEqual(nothing.EitherT, Either.LeftT)
+
+    def test_left_skips_binds(self):
+        result = task.run_task(task.Task.Left("bad") >=
+                               (lambda x: task.Task.Right(x)))
+        self.assertEqual(str(result), "Left(bad)")
+
+    def test_attempt_catches_exceptions(self):
+        result = task.run_task(task.Task.attempt(lambda: 1 / 0))
+        self.assertTrue(isinstance(result.value, ZeroDivisionError))
+
+    def test_left_nested_binds_are_stack_safe(self):
+        chain = task.Task.Right(0)
+        for _ in range(5000):
+            chain = chain >= (lambda x: task.Task.Right(x + 1))
+        self.assertEqual(task.run_task(chain).value, 5000)
+
+    def test_right_nested_binds_are_stack_safe(self):
+        def count(n):
+            "Binds n more times."
+            if n == 0:
+                return task.Task.Right("done")
+            return task.Task.Right(n) >= (lambda _: count(n - 1))
+        self.assertEqual(task.run_task(count(5000)).value, "done")
+
+    def test_sequence(self):
+        result = task.run_task(monad.sequence(
+            task.Task, [task.Task.Right(i) for i in range(20000)]))
+        self.assertEqual(result.value, range(20000))
+
+
+if __name__ == '__main__':
+    unittest.main()
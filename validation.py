@@ -0,0 +1,89 @@
+"""
+Implementation of the Validation applicative, as in Data.Validation.
+
+Validation looks like Either, but combining several Validations with
+the functions in applicative.py collects the errors of every Failure
+instead of stopping at the first one. That makes it an Applicative but
+not a Monad, so it has no bind.
+"""
+# pylint: disable=C0103
+
+import either
+
+
+class Validation(object):
+    """Failure [e] or Success a.
+
+    Failures hold a list of errors, so that the failures of independent
+    validations can be concatenated.
+    """
+    FailureT = 0
+    SuccessT = 1
+
+    def __init__(self, ValidationT, value):
+        "Should not be called directly."
+        self.ValidationT = ValidationT
+        self.value = value
+
+    @classmethod
+    def Failure(cls, *errors):
+        "Constructor for Failure values, from one or more errors."
+        return cls(Validation.FailureT, list(errors))
+
+    @classmethod
+    def Success(cls, value):
+        "Constructor for Success values."
+        return cls(Validation.SuccessT, value)
+
+    @classmethod
+    def pure(cls, value):
+        "Equivalent to Haskell's pure."
+        return cls.Success(value)
+
+    @property
+    def is_failure(self):
+        "Returns true if this is a Failure"
+        return self.ValidationT == Validation.FailureT
+
+    @property
+    def is_success(self):
+        "Returns true if this is a Success"
+        return self.ValidationT == Validation.SuccessT
+
+    def __str__(self):
+        return "{}({})".format("Success" if self.is_success
+                               else "Failure", self.value)
+
+    def __repr__(self):
+        return str(self)
+
+    def __reduce__(self):
+        "Pickles as a constructor call instead of a __dict__."
+        return (type(self), (self.ValidationT, self.value))
+
+
+def validation(failure_callback, success_callback, validation_value):
+    """
+    Case analysis for Validation.
+
+    If the value is a Failure, apply the failure_callback to its errors.
+    If the value is a Success, apply the success_callback.
+    """
+    if validation_value.is_success:
+        return success_callback(validation_value.value)
+    else:
+        return failure_callback(validation_value.value)
+
+
+def from_either(either_value):
+    "Left(e) becomes Failure(e), Right(x) becomes Success(x)."
+    if either_value.EitherT == either.Either.RightT:
+        return Validation.Success(either_value.value)
+    return Validation.Failure(either_value.value)
+
+
+def to_either(validation_value):
+    "Failure(errors) becomes Left(errors), Success(x) becomes Right(x)."
+    if validation_value.is_success:
+        return either.Either.Right(validation_value.value)
+    return either.Either.Left(validation_value.value)